@@ -0,0 +1,4 @@
+
+# This file is auto-generated with the version information during setup.py installation.
+
+__version__ = '1.8.6+078298f'
@@ -4,12 +4,10 @@
 import functools
 import logging
 import operator
-import re
 import warnings
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from contextlib import ExitStack, contextmanager
-from functools import reduce
 from timeit import default_timer
 
 import torch
@@ -42,7 +40,7 @@ from pyro.infer.smcfilter import SMCFailed
 from pyro.infer.util import is_validation_enabled
 from pyro.optim import ClippedAdam
 from pyro.poutine.util import site_is_factor, site_is_subsample
-from pyro.util import warn_if_nan
+from pyro.util import ignore_jit_warnings, warn_if_nan
 
 from .distributions import (
     set_approx_log_prob_tol,
@@ -133,6 +131,15 @@ class CompartmentalModel(ABC):
         expensive enumeration-based algorithm ``.fit_mcmc(num_quant_bins=4,
         num_samples=10000, num_chains=2)`` (GPU recommended).
 
+    To run on GPU, call ``torch.set_default_device("cuda")`` before
+    constructing data tensors and the model, as in the epidemiology examples.
+    Device placement follows the data: the dominant enumeration tensor of
+    shape ``(T, Q**C, Q**C)`` then stays on device through the parallel-scan
+    elimination, where each reduction level is a single batched kernel. For
+    small models (roughly ``duration * Q**(2C)`` below a million elements)
+    kernel launch overhead typically outweighs the gain, and the CPU is
+    often faster.
+
     :ivar dict samples: Dictionary of posterior samples.
     :param list compartments: A list of strings of compartment names.
     :param int duration: The number of discrete time steps in this model.
@@ -177,6 +184,10 @@ class CompartmentalModel(ABC):
 
         # Inference state.
         self.samples = {}
+        self._time_elim_mode = None
+        self._compiled_time_elim = None
+        self._enum_reshape_cache = {}
+        self._haar_reparams = {}
         self._clear_plates()
 
     @property
@@ -236,12 +247,22 @@ class CompartmentalModel(ABC):
             curr = prev.copy()
             with poutine.trace() as tr:
                 self.transition(params, curr, 0)
-        return frozenset(
-            re.match("(.*)_0", name).group(1)
-            for name, site in tr.trace.nodes.items()
-            if site["type"] == "sample"
-            if not site_is_subsample(site)
-        )
+        names = set()
+        for name, site in tr.trace.nodes.items():
+            if site["type"] == "sample" and not site_is_subsample(site):
+                assert name.endswith("_0"), name
+                names.add(name[:-2])
+        return frozenset(names)
+
+    @lazy_property
+    def _compartment_site_names(self):
+        """
+        Names of the per-time-step compartment sites, indexed by [t][c].
+        """
+        return [
+            ["{}_{}".format(name, t) for name in self.compartments]
+            for t in range(self.duration)
+        ]
 
     # Overridable attributes and methods ########################################
 
@@ -441,13 +462,7 @@ class CompartmentalModel(ABC):
 
         # Setup Haar wavelet transform.
         if haar:
-            time_dim = -2 if self.is_regional else -1
-            dims = {"auxiliary": time_dim}
-            supports = {"auxiliary": constraints.interval(-0.5, self.population + 0.5)}
-            for name, (fn, is_regional) in self._non_compartmental.items():
-                dims[name] = time_dim - fn.event_dim
-                supports[name] = fn.support
-            haar = _HaarSplitReparam(0, self.duration, dims, supports)
+            haar = self._haar_reparam()
 
         # Heuristically initialize to feasible latents.
         heuristic_options = {
@@ -548,6 +563,13 @@ class CompartmentalModel(ABC):
             pulled out and have special meaning.
         :param int num_samples: Number of posterior samples to draw via mcmc.
             Defaults to 100.
+        :param int num_chains: Number of MCMC chains to run. Defaults to 1.
+            If more than 1, chains run in parallel processes, amortizing
+            warmup cost across chains; jit compilation happens per process.
+        :param str mp_context: Multiprocessing context used when
+            ``num_chains > 1``. Use ``mp_context="spawn"`` with CUDA or
+            whenever the default fork context hangs; note spawn requires the
+            model class to be importable in subprocesses.
         :param int max_tree_depth: (Default 5). Max tree depth of the
             :class:`~pyro.infer.mcmc.nuts.NUTS` kernel.
         :param full_mass: Specification of mass matrix of the
@@ -555,6 +577,23 @@ class CompartmentalModel(ABC):
             over global random variables.
         :param bool arrowhead_mass: Whether to treat ``full_mass`` as the head
             of an arrowhead matrix versus simply as a block. Defaults to False.
+        :param bool jit_compile: Whether to jit compile the potential energy
+            computation of the :class:`~pyro.infer.mcmc.nuts.NUTS` kernel.
+            This eliminates most per-step Python overhead and is the cheapest
+            way to speed up inference on models with many small tensor ops.
+            When ``num_quant_bins > 1`` this additionally traces the
+            parallel-scan variable elimination computation of the quantized
+            model. Defaults to False.
+        :param dict jit_options: Options to pass to the jit compiler. Defaults
+            to None.
+        :param bool torch_compile: Whether to specialize the parallel-scan
+            variable elimination computation of the quantized model for this
+            model's fixed shapes via :func:`torch.compile`, fusing its reshape
+            + log-matmul-exp chain into few kernels. Only used when
+            ``num_quant_bins > 1``, and takes precedence over the trace-based
+            ``jit_compile`` path for that computation. Defaults to False.
+        :param bool ignore_jit_warnings: Whether to ignore warnings raised
+            while jit compiling. Defaults to True.
         :param int num_quant_bins: If greater than 1, use asymptotically exact
             inference via local enumeration over this many quantization bins.
             If equal to 1, use continuous-valued relaxed approximate inference.
@@ -579,6 +618,13 @@ class CompartmentalModel(ABC):
         assert isinstance(self.num_quant_bins, int)
         assert self.num_quant_bins >= 1
         self.relaxed = self.num_quant_bins == 1
+        if options.pop("torch_compile", False):
+            self._time_elim_mode = "compile"
+        elif options.get("jit_compile", False):
+            self._time_elim_mode = "trace"
+        else:
+            self._time_elim_mode = None
+        self._compiled_time_elim = None
 
         # Setup Haar wavelet transform.
         haar = options.pop("haar", False)
@@ -596,17 +642,11 @@ class CompartmentalModel(ABC):
             full_mass = True  # Effectively full mass.
             haar_full_mass = 0
         if haar:
-            time_dim = -2 if self.is_regional else -1
-            dims = {"auxiliary": time_dim}
-            supports = {"auxiliary": constraints.interval(-0.5, self.population + 0.5)}
-            for name, (fn, is_regional) in self._non_compartmental.items():
-                dims[name] = time_dim - fn.event_dim
-                supports[name] = fn.support
-            haar = _HaarSplitReparam(haar_full_mass, self.duration, dims, supports)
+            haar = self._haar_reparam(haar_full_mass)
         if haar_full_mass:
             assert full_mass and isinstance(full_mass, list)
             full_mass = full_mass[:]
-            full_mass[0] += tuple(name + "_haar_split_0" for name in sorted(dims))
+            full_mass[0] += tuple(name + "_haar_split_0" for name in sorted(haar.dims))
 
         # Heuristically initialize to feasible latents.
         heuristic_options = {
@@ -785,6 +825,25 @@ class CompartmentalModel(ABC):
 
     # Internal helpers ########################################
 
+    def _haar_reparam(self, split=0):
+        """
+        Constructs a :class:`_HaarSplitReparam` over the auxiliary variable
+        and all non-compartmental time series, splitting off the ``split``
+        lowest-frequency components. Instances are cached so that repeated
+        fits reuse the underlying reparameterizers and transforms.
+        """
+        haar = self._haar_reparams.get(split)
+        if haar is None:
+            time_dim = -2 if self.is_regional else -1
+            dims = {"auxiliary": time_dim}
+            supports = {"auxiliary": constraints.interval(-0.5, self.population + 0.5)}
+            for name, (fn, is_regional) in self._non_compartmental.items():
+                dims[name] = time_dim - fn.event_dim
+                supports[name] = fn.support
+            haar = _HaarSplitReparam(split, self.duration, dims, supports)
+            self._haar_reparams[split] = haar
+        return haar
+
     def _heuristic(self, haar, **options):
         with poutine.block():
             init_values = self.heuristic(**options)
@@ -808,14 +867,15 @@ class CompartmentalModel(ABC):
         :param dict samples: A dictionary of samples.
         """
         time_dim = -2 if self.is_regional else -1
-        for name in set(self.compartments).union(self.series):
-            pattern = name + "_[0-9]+"
-            series = []
-            for key in list(samples):
-                if re.match(pattern, key):
-                    series.append(samples.pop(key))
-            if not series:
-                continue
+        targets = set(self.compartments).union(self.series)
+        buckets = {}
+        for key in list(samples):
+            name, _, t = key.rpartition("_")
+            if t.isdigit() and name in targets:
+                buckets.setdefault(name, []).append((int(t), samples.pop(key)))
+        for name, series in buckets.items():
+            series.sort(key=operator.itemgetter(0))
+            series = [value for _, value in series]
             assert len(series) == self.duration + forecast
             series = torch.broadcast_tensors(*map(torch.as_tensor, series))
             dim = time_dim - trace.nodes[name + "_0"]["fn"].event_dim
@@ -858,34 +918,56 @@ class CompartmentalModel(ABC):
             result[name] = site["fn"], is_regional
         return result
 
-    def _sample_auxiliary(self):
+    @lazy_property
+    def _auxiliary_dist(self):
         """
-        Sample both compartmental and non-compartmental auxiliary variables.
+        The improper uniform distribution of the compartmental auxiliary
+        variable. Its shape and support are fixed at construction time, so
+        this is built only once rather than on each potential evaluation.
         """
         C = len(self.compartments)
         T = self.duration
         R_shape = getattr(self.population, "shape", ())  # Region shape.
-
-        # Sample the compartmental continuous reparameterizing variable.
         shape = (C, T) + R_shape
-        auxiliary = pyro.sample(
-            "auxiliary",
+        return (
             dist.Uniform(-0.5, self.population + 0.5)
             .mask(False)
             .expand(shape)
-            .to_event(),
+            .to_event()
         )
-        extra_dims = auxiliary.dim() - len(shape)
 
-        # Sample any non-compartmental time series in batch.
-        non_compartmental = OrderedDict()
+    @lazy_property
+    def _non_compartmental_dists(self):
+        """
+        A dict mapping name -> improper uniform distribution for each
+        non-compartmental site, built once like :attr:`_auxiliary_dist`.
+        """
+        T = self.duration
+        R_shape = getattr(self.population, "shape", ())  # Region shape.
+        result = OrderedDict()
         for name, (fn, is_regional) in self._non_compartmental.items():
             fn = dist.ImproperUniform(fn.support, fn.batch_shape, fn.event_shape)
             shape = (T,)
             if self.is_regional:
                 shape += R_shape if is_regional else (1,)
             # Manually expand, avoiding plates to enable HaarReparam and SplitReparam.
-            non_compartmental[name] = pyro.sample(name, fn.expand(shape).to_event())
+            result[name] = fn.expand(shape).to_event()
+        return result
+
+    def _sample_auxiliary(self):
+        """
+        Sample both compartmental and non-compartmental auxiliary variables.
+        """
+        R_shape = getattr(self.population, "shape", ())  # Region shape.
+
+        # Sample the compartmental continuous reparameterizing variable.
+        auxiliary = pyro.sample("auxiliary", self._auxiliary_dist)
+        extra_dims = auxiliary.dim() - 2 - len(R_shape)
+
+        # Sample any non-compartmental time series in batch.
+        non_compartmental = OrderedDict()
+        for name, fn in self._non_compartmental_dists.items():
+            non_compartmental[name] = pyro.sample(name, fn)
 
         # Move event dims to time_plate and region_plate dims.
         if extra_dims:  # If inside particle_plate.
@@ -928,7 +1010,11 @@ class CompartmentalModel(ABC):
         # Sample initial values.
         state = self.initialize(params)
         state = {
-            k: v if isinstance(v, torch.Tensor) else torch.tensor(float(v))
+            k: (
+                v
+                if isinstance(v, torch.Tensor)
+                else torch.as_tensor(v, dtype=torch.get_default_dtype())
+            )
             for k, v in state.items()
         }
 
@@ -981,7 +1067,7 @@ class CompartmentalModel(ABC):
                 # Extract and enumerate all compartmental variables.
                 for c, name in enumerate(self.compartments):
                     curr[name] = quantize(
-                        "{}_{}".format(name, t),
+                        self._compartment_site_names[t][c],
                         aux[c][t],
                         min=0,
                         max=self.population,
@@ -997,6 +1083,43 @@ class CompartmentalModel(ABC):
 
         self._clear_plates()
 
+    def _enum_reshape(self, tensor, position):
+        """
+        Moves an enumeration dim from the right to dim ``position`` counting
+        left of the plates, similar to EnumMessenger. The permutation and
+        target shape depend only on the input shape and position, so they are
+        computed once and cached across potential energy evaluations.
+        """
+        Q = self.num_quant_bins
+        assert tensor.size(-1) == Q
+        assert tensor.dim() <= self.max_plate_nesting + 2
+        key = tensor.shape, position
+        cached = self._enum_reshape_cache.get(key)
+        if cached is None:
+            perm = (tensor.dim() - 1,) + tuple(range(tensor.dim() - 1))
+            shape = [Q] + [1] * (position + self.max_plate_nesting - (tensor.dim() - 2))
+            shape.extend(tensor.shape[:-1])
+            cached = perm, torch.Size(shape)
+            self._enum_reshape_cache[key] = cached
+        perm, shape = cached
+        return tensor.permute(perm).reshape(shape)
+
+    def _eliminate_time_dim(self, logp):
+        """
+        Sums out the joint enumerated state of the summed transition log
+        probability tensor ``logp``, contracting the time dim via parallel-scan
+        log-matmul-exp. This is pure tensor code and hence is jit traceable.
+        """
+        C = len(self.compartments)
+        T = self.duration
+        Q = self.num_quant_bins
+        logp = logp.reshape(Q**C, Q**C, T, -1)  # prev, curr, T, batch
+        logp = logp.permute(3, 2, 0, 1).squeeze(0)  # batch, T, prev, curr
+        logp = pyro.distributions.hmm._sequential_logmatmulexp(
+            logp
+        )  # batch, prev, curr
+        return logp.reshape(-1, Q**C * Q**C).logsumexp(-1).sum()
+
     def _quantized_model(self):
         """
         Quantized vectorized model used for parallel-scan enumerated inference.
@@ -1033,18 +1156,10 @@ class CompartmentalModel(ABC):
                 prev[name] = cat2(init[name], curr[name][:-1], dim=-curr[name].dim())
 
         # Reshape to support broadcasting, similar to EnumMessenger.
-        def enum_reshape(tensor, position):
-            assert tensor.size(-1) == Q
-            assert tensor.dim() <= self.max_plate_nesting + 2
-            tensor = tensor.permute(tensor.dim() - 1, *range(tensor.dim() - 1))
-            shape = [Q] + [1] * (position + self.max_plate_nesting - (tensor.dim() - 2))
-            shape.extend(tensor.shape[1:])
-            return tensor.reshape(shape)
-
         for e, name in enumerate(self.compartments):
-            curr[name] = enum_reshape(curr[name], e)
-            logp[name] = enum_reshape(logp[name], e)
-            prev[name] = enum_reshape(prev[name], e + C)
+            curr[name] = self._enum_reshape(curr[name], e)
+            logp[name] = self._enum_reshape(logp[name], e)
+            prev[name] = self._enum_reshape(prev[name], e + C)
 
         # Enable approximate inference by using aux as a non-enumerated proxy
         # for enumerated compartment values.
@@ -1074,14 +1189,35 @@ class CompartmentalModel(ABC):
                     )
                 logp[name] = site["log_prob"]
 
-        # Manually perform variable elimination.
-        logp = reduce(operator.add, logp.values())
-        logp = logp.reshape(Q**C, Q**C, T, -1)  # prev, curr, T, batch
-        logp = logp.permute(3, 2, 0, 1).squeeze(0)  # batch, T, prev, curr
-        logp = pyro.distributions.hmm._sequential_logmatmulexp(
-            logp
-        )  # batch, prev, curr
-        logp = logp.reshape(-1, Q**C * Q**C).logsumexp(-1).sum()
+        # Manually perform variable elimination. Rather than chaining C-1
+        # broadcasted adds, each materializing a new enumerated temporary,
+        # allocate the full broadcast shape once and accumulate in-place.
+        values = list(logp.values())
+        logp = values[0].new_zeros(torch.broadcast_shapes(*(v.shape for v in values)))
+        for v in values:
+            logp.add_(v)
+        if self._time_elim_mode is not None and not torch.jit.is_tracing():
+            if self._compiled_time_elim is None:
+                if self._time_elim_mode == "compile":
+                    # Shapes are constant for a given fit, so specialize.
+                    self._compiled_time_elim = torch.compile(
+                        self._eliminate_time_dim, fullgraph=True, dynamic=False
+                    )
+                else:
+                    self._compiled_time_elim = torch.jit.trace(
+                        ignore_jit_warnings()(self._eliminate_time_dim),
+                        (logp,),
+                        check_trace=False,
+                    )
+            with warnings.catch_warnings():
+                # Dynamo guard evaluation inspects Tensor.grad, which warns
+                # for non-leaf tensors like the accumulated logp.
+                warnings.filterwarnings(
+                    "ignore", message="The .grad attribute of a Tensor"
+                )
+                logp = self._compiled_time_elim(logp)
+        else:
+            logp = self._eliminate_time_dim(logp)
         warn_if_nan(logp)
         pyro.factor("transition", logp)
 
@@ -1202,6 +1338,14 @@ class _HaarSplitReparam:
         self.duration = duration
         self.dims = dims
         self.supports = supports
+        # Construct reparameterizers and inverse transforms once, so that
+        # repeated .reparam() and .aux_to_user() calls reuse their caches.
+        self._reparams = {
+            name: HaarReparam(dim=dim, flip=True) for name, dim in dims.items()
+        }
+        self._transforms = {
+            name: HaarTransform(dim=dim, flip=True) for name, dim in dims.items()
+        }
 
     def __bool__(self):
         return True
@@ -1211,10 +1355,7 @@ class _HaarSplitReparam:
         Wrap a model with ``poutine.reparam``.
         """
         # Transform to Haar coordinates.
-        config = {}
-        for name, dim in self.dims.items():
-            config[name] = HaarReparam(dim=dim, flip=True)
-        model = poutine.reparam(model, config)
+        model = poutine.reparam(model, self._reparams.copy())
 
         if self.split:
             # Split into low- and high-frequency parts.
@@ -1242,8 +1383,8 @@ class _HaarSplitReparam:
                 )
 
         # Transform back from Haar coordinates.
-        for name, dim in self.dims.items():
+        for name in self.dims:
             x = samples.pop(name + "_haar")
-            x = HaarTransform(dim=dim, flip=True).inv(x)
+            x = self._transforms[name].inv(x)
             x = biject_to(self.supports[name])(x)
             samples[name] = x
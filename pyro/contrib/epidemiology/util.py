@@ -7,7 +7,7 @@ import torch
 import pyro
 import pyro.distributions as dist
 import pyro.poutine as poutine
-from pyro.distributions.util import broadcast_shape
+from pyro.distributions.util import broadcast_shape, torch_jit_script_if_tracing
 from pyro.ops.special import safe_log
 
 
@@ -171,11 +171,157 @@ W16 = [
 W16 = numpy.array(W16)
 
 
+@torch_jit_script_if_tracing
+def _bin_probs_4(s: torch.Tensor, t: torch.Tensor) -> torch.Tensor:
+    # This cubic spline interpolates over the nearest four integers, ensuring
+    # piecewise quadratic gradients.
+    ss = s * s
+    tt = t * t
+
+    probs = torch.stack(
+        [
+            t * tt,
+            4 + ss * (3 * s - 6),
+            4 + tt * (3 * t - 6),
+            s * ss,
+        ],
+        dim=-1,
+    ) * (1 / 6)
+    return probs
+
+
+@torch_jit_script_if_tracing
+def _bin_probs_8(s: torch.Tensor, t: torch.Tensor) -> torch.Tensor:
+    # This quintic spline interpolates over the nearest eight integers, ensuring
+    # piecewise quartic gradients.
+    ss = s * s
+    tt = t * t
+
+    s3 = ss * s
+    s4 = ss * ss
+    s5 = s3 * ss
+
+    t3 = tt * t
+    t4 = tt * tt
+    t5 = t3 * tt
+
+    probs = torch.stack(
+        [
+            2 * t5,
+            2 + 10 * t + 20 * tt + 20 * t3 + 10 * t4 - 7 * t5,
+            55 + 115 * t + 70 * tt - 9 * t3 - 25 * t4 + 7 * t5,
+            302 - 100 * ss + 10 * s4,
+            302 - 100 * tt + 10 * t4,
+            55 + 115 * s + 70 * ss - 9 * s3 - 25 * s4 + 7 * s5,
+            2 + 10 * s + 20 * ss + 20 * s3 + 10 * s4 - 7 * s5,
+            2 * s5,
+        ],
+        dim=-1,
+    ) * (1 / 840)
+    return probs
+
+
+@torch_jit_script_if_tracing
+def _bin_probs_12(s: torch.Tensor, t: torch.Tensor) -> torch.Tensor:
+    # This septic spline interpolates over the nearest 12 integers
+    ss = s * s
+    tt = t * t
+
+    s3 = ss * s
+    s4 = ss * ss
+    s5 = s3 * ss
+    s6 = s3 * s3
+    s7 = s4 * s3
+
+    t3 = tt * t
+    t4 = tt * tt
+    t5 = t3 * tt
+    t6 = t3 * t3
+    t7 = t4 * t3
+
+    probs = torch.stack(
+        [
+            693 * t7,
+            693
+            + 4851 * t
+            + 14553 * tt
+            + 24255 * t3
+            + 24255 * t4
+            + 14553 * t5
+            + 4851 * t6
+            - 3267 * t7,
+            84744
+            + 282744 * t
+            + 382536 * tt
+            + 249480 * t3
+            + 55440 * t4
+            - 24948 * t5
+            - 18018 * t6
+            + 5445 * t7,
+            1017423
+            + 1823283 * t
+            + 1058211 * tt
+            + 51975 * t3
+            - 148995 * t4
+            - 18711 * t5
+            + 20097 * t6
+            - 3267 * t7,
+            3800016
+            + 3503808 * t
+            + 365904 * tt
+            - 443520 * t3
+            - 55440 * t4
+            + 33264 * t5
+            - 2772 * t6,
+            8723088 - 1629936 * ss + 110880.0 * s4 - 2772 * s6,
+            8723088 - 1629936 * tt + 110880.0 * t4 - 2772 * t6,
+            3800016
+            + 3503808 * s
+            + 365904 * ss
+            - 443520 * s3
+            - 55440 * s4
+            + 33264 * s5
+            - 2772 * s6,
+            1017423
+            + 1823283 * s
+            + 1058211 * ss
+            + 51975 * s3
+            - 148995 * s4
+            - 18711 * s5
+            + 20097 * s6
+            - 3267 * s7,
+            84744
+            + 282744 * s
+            + 382536 * ss
+            + 249480 * s3
+            + 55440 * s4
+            - 24948 * s5
+            - 18018 * s6
+            + 5445 * s7,
+            693
+            + 4851 * s
+            + 14553 * ss
+            + 24255 * s3
+            + 24255 * s4
+            + 14553 * s5
+            + 4851 * s6
+            - 3267 * s7,
+            693 * s7,
+        ],
+        dim=-1,
+    ) * (1 / 32931360)
+    return probs
+
+
 def compute_bin_probs(s, num_quant_bins):
     """
     Compute categorical probabilities for a quantization scheme with num_quant_bins many
     bins. `s` is a real-valued tensor with values in [0, 1]. Returns probabilities
     of shape `s.shape` + `(num_quant_bins,)`
+
+    The spline kernels for common bin counts are jit scripted when inside a
+    trace, compiling their polynomial evaluation into a single fused graph
+    rather than a chain of Python-dispatched tensor ops.
     """
 
     t = 1 - s
@@ -184,135 +330,14 @@ def compute_bin_probs(s, num_quant_bins):
         probs = torch.stack([t, s], dim=-1)
         return probs
 
-    ss = s * s
-    tt = t * t
-
     if num_quant_bins == 4:
-        # This cubic spline interpolates over the nearest four integers, ensuring
-        # piecewise quadratic gradients.
-        probs = torch.stack(
-            [
-                t * tt,
-                4 + ss * (3 * s - 6),
-                4 + tt * (3 * t - 6),
-                s * ss,
-            ],
-            dim=-1,
-        ) * (1 / 6)
-        return probs
+        return _bin_probs_4(s, t)
 
     if num_quant_bins == 8:
-        # This quintic spline interpolates over the nearest eight integers, ensuring
-        # piecewise quartic gradients.
-        s3 = ss * s
-        s4 = ss * ss
-        s5 = s3 * ss
-
-        t3 = tt * t
-        t4 = tt * tt
-        t5 = t3 * tt
-
-        probs = torch.stack(
-            [
-                2 * t5,
-                2 + 10 * t + 20 * tt + 20 * t3 + 10 * t4 - 7 * t5,
-                55 + 115 * t + 70 * tt - 9 * t3 - 25 * t4 + 7 * t5,
-                302 - 100 * ss + 10 * s4,
-                302 - 100 * tt + 10 * t4,
-                55 + 115 * s + 70 * ss - 9 * s3 - 25 * s4 + 7 * s5,
-                2 + 10 * s + 20 * ss + 20 * s3 + 10 * s4 - 7 * s5,
-                2 * s5,
-            ],
-            dim=-1,
-        ) * (1 / 840)
-        return probs
+        return _bin_probs_8(s, t)
 
     if num_quant_bins == 12:
-        # This septic spline interpolates over the nearest 12 integers
-        s3 = ss * s
-        s4 = ss * ss
-        s5 = s3 * ss
-        s6 = s3 * s3
-        s7 = s4 * s3
-
-        t3 = tt * t
-        t4 = tt * tt
-        t5 = t3 * tt
-        t6 = t3 * t3
-        t7 = t4 * t3
-
-        probs = torch.stack(
-            [
-                693 * t7,
-                693
-                + 4851 * t
-                + 14553 * tt
-                + 24255 * t3
-                + 24255 * t4
-                + 14553 * t5
-                + 4851 * t6
-                - 3267 * t7,
-                84744
-                + 282744 * t
-                + 382536 * tt
-                + 249480 * t3
-                + 55440 * t4
-                - 24948 * t5
-                - 18018 * t6
-                + 5445 * t7,
-                1017423
-                + 1823283 * t
-                + 1058211 * tt
-                + 51975 * t3
-                - 148995 * t4
-                - 18711 * t5
-                + 20097 * t6
-                - 3267 * t7,
-                3800016
-                + 3503808 * t
-                + 365904 * tt
-                - 443520 * t3
-                - 55440 * t4
-                + 33264 * t5
-                - 2772 * t6,
-                8723088 - 1629936 * ss + 110880.0 * s4 - 2772 * s6,
-                8723088 - 1629936 * tt + 110880.0 * t4 - 2772 * t6,
-                3800016
-                + 3503808 * s
-                + 365904 * ss
-                - 443520 * s3
-                - 55440 * s4
-                + 33264 * s5
-                - 2772 * s6,
-                1017423
-                + 1823283 * s
-                + 1058211 * ss
-                + 51975 * s3
-                - 148995 * s4
-                - 18711 * s5
-                + 20097 * s6
-                - 3267 * s7,
-                84744
-                + 282744 * s
-                + 382536 * ss
-                + 249480 * s3
-                + 55440 * s4
-                - 24948 * s5
-                - 18018 * s6
-                + 5445 * s7,
-                693
-                + 4851 * s
-                + 14553 * ss
-                + 24255 * s3
-                + 24255 * s4
-                + 14553 * s5
-                + 4851 * s6
-                - 3267 * s7,
-                693 * s7,
-            ],
-            dim=-1,
-        ) * (1 / 32931360)
-        return probs
+        return _bin_probs_12(s, t)
 
     if num_quant_bins == 16:
         # This nonic spline interpolates over the nearest 16 integers
@@ -360,6 +385,24 @@ def quantize(name, x_real, min, max, num_quant_bins=4):
     return pyro.deterministic(name, x, event_dim=0)
 
 
+_enum_offsets_cache = {}
+
+
+def _enum_offsets(num_quant_bins, device):
+    """
+    Cached integer offsets ``1 - num_quant_bins//2, ..., num_quant_bins//2``
+    of the quantization lattice points around ``floor(x)``.
+    """
+    key = num_quant_bins, device
+    q = _enum_offsets_cache.get(key)
+    if q is None:
+        arange_min = 1 - num_quant_bins // 2
+        arange_max = 1 + num_quant_bins // 2
+        q = torch.arange(arange_min, arange_max, device=device)
+        _enum_offsets_cache[key] = q
+    return q
+
+
 def quantize_enumerate(x_real, min, max, num_quant_bins=4):
     """Quantize, then manually enumerate."""
     assert _all(min < max)
@@ -368,9 +411,7 @@ def quantize_enumerate(x_real, min, max, num_quant_bins=4):
     probs = compute_bin_probs(x_real - lb, num_quant_bins=num_quant_bins)
     logits = safe_log(probs)
 
-    arange_min = 1 - num_quant_bins // 2
-    arange_max = 1 + num_quant_bins // 2
-    q = torch.arange(arange_min, arange_max)
+    q = _enum_offsets(num_quant_bins, x_real.device)
 
     x = lb.unsqueeze(-1) + q
     x = torch.max(x, 2 * _unsqueeze(min) - 1 - x)
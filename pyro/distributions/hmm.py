@@ -68,7 +68,10 @@ def _sequential_logmatmulexp(logits):
 
         x[..., 0, :, :] @ x[..., 1, :, :] @ ... @ x[..., T-1, :, :]
 
-    but does so numerically stably in log space.
+    but does so numerically stably in log space. Despite the name, this
+    contracts adjacent pairs at each level, so the reduction runs as
+    ``ceil(log2(T))`` batched log-matmul-exp levels rather than ``T - 1``
+    sequential ones.
     """
     batch_shape = logits.shape[:-3]
     state_dim = logits.size(-1)
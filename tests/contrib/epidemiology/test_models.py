@@ -53,6 +53,7 @@ logger = logging.getLogger(__name__)
         ("mcmc", {"jit_compile": True}),
         ("mcmc", {"jit_compile": True, "haar_full_mass": 0}),
         ("mcmc", {"jit_compile": True, "num_quant_bins": 2}),
+        ("mcmc", {"torch_compile": True, "num_quant_bins": 2}),
         ("mcmc", {"num_chains": 2, "mp_context": "spawn"}),
         ("mcmc", {"num_chains": 2, "mp_context": "spawn", "num_quant_bins": 2}),
         ("mcmc", {"num_chains": 2, "mp_context": "spawn", "jit_compile": True}),